@@ -0,0 +1,70 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Compiled hot paths for dps150.protocol.
+
+Optional: protocol.py imports these when the extension is built and keeps its
+pure-Python versions otherwise. Behaviour must match those versions exactly.
+"""
+
+
+cdef enum:
+    HEADER_INPUT = 0xF0
+    HEADER_OUTPUT = 0xF1
+
+
+cdef inline unsigned int _sum(const unsigned char[::1] buf, Py_ssize_t start, Py_ssize_t stop) noexcept nogil:
+    cdef unsigned int s = 0
+    cdef Py_ssize_t i
+    for i in range(start, stop):
+        s += buf[i]
+    return s
+
+
+cpdef int checksum(int type_id, payload):
+    cdef const unsigned char[::1] view
+    # like the pure-Python version, accept any iterable of ints (e.g. a list)
+    if not isinstance(payload, (bytes, bytearray)):
+        payload = bytes(payload)
+    view = payload
+    cdef Py_ssize_t n = view.shape[0]
+    return (type_id + n + _sum(view, 0, n)) & 0xFF
+
+
+def _find_frame(const unsigned char[::1] buffer, Py_ssize_t start=0, end=None, on_bad_checksum=None):
+    cdef Py_ssize_t n = buffer.shape[0]
+    cdef Py_ssize_t i, c4, payload_end
+    cdef unsigned char header
+
+    # boundscheck is off: a negative start would read before the buffer
+    if start < 0:
+        raise ValueError(f"start must be >= 0, got {start}")
+    if end is not None and end < n:
+        n = end
+    if n - start < 6:
+        return None, start
+
+    i = start
+    while i < n - 5:
+        header = buffer[i]
+        if header != HEADER_INPUT and header != HEADER_OUTPUT:
+            i += 1
+            continue
+
+        c4 = buffer[i + 3]
+        payload_end = i + 4 + c4
+        if payload_end >= n:
+            # not enough yet
+            return None, i
+
+        if ((buffer[i + 2] + c4 + _sum(buffer, i + 4, payload_end)) & 0xFF) != buffer[payload_end]:
+            # checksum mismatch: skip this byte and continue searching
+            if on_bad_checksum is not None:
+                on_bad_checksum()
+            i += 1
+            continue
+
+        payload = (<const char*>&buffer[0])[i + 4:payload_end]
+        return (header, buffer[i + 1], buffer[i + 2], payload), payload_end + 1
+
+    # no header before n - 5; the last 5 bytes may still start one
+    return None, n - 5
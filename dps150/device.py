@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import Callable, Dict, Optional
+from typing import Callable, Dict, List, Optional
 
 import serial  # pyserial
 
@@ -10,32 +10,57 @@ from .protocol import (
     HEADER_OUTPUT,
     CMD_BAUD,
     CMD_SESSION,
-    ALL,
     MODEL_NAME,
     HARDWARE_VERSION,
     FIRMWARE_VERSION,
-    METERING_ENABLE,
-    OUTPUT_ENABLE,
+    DISABLE_OUTPUT_FRAME,
+    ENABLE_OUTPUT_FRAME,
+    GET_ALL_FRAME,
+    SESSION_CLOSE_FRAME,
+    SESSION_OPEN_FRAME,
+    START_METERING_FRAME,
+    STOP_METERING_FRAME,
     encode_frame,
     encode_get,
-    encode_session,
     encode_set_byte,
     encode_set_float,
     parse_payload,
-    try_extract_frame,
+    scan_frame,
 )
 
 
 UpdateCallback = Callable[[Dict[str, object]], None]
 
+# Number of recent bad-checksum frames at which writes are paced by the full write_delay_s.
+BAD_FRAMES_FOR_FULL_DELAY = 3
+
+# Fixed RX buffer size; comfortably holds many max-size (5 + 255 byte) frames.
+RX_BUFFER_SIZE = 8192
+
 
 class DPS150:
     """
     Simple DPS150 serial client.
 
-    - open(): opens serial and starts background reader thread.
+    - open(): opens serial and starts background reader thread (skip it with
+      start_reader=False for fire-and-forget commands that ignore responses).
     - close(): stops reader and closes serial.
     - callback(update_dict): called whenever a frame is parsed into updates.
+      With changes_only=True (default) only keys whose value differs from the
+      last reported one are passed; set it to False to get every parsed field.
+    - write_delay_s: upper bound for the gap between writes. RTS/CTS flow control
+      already throttles the line, so with a reader thread pacing starts at 0 and
+      only grows towards this value while the reader sees frames with bad
+      checksums. Without a reader there is no such feedback, so every write is
+      followed by the full write_delay_s.
+    - batch_init: send the open() init sequence as one write (default). This
+      is not yet verified on hardware; set False to fall back to one write per
+      frame, each followed by the full write_delay_s, as before batching.
+
+    Threading: the serial port is single-producer/single-consumer. Only the
+    background reader thread reads, and all commands (open/close/get/set) must
+    be issued from one thread, so writes take no lock. Do not send commands from
+    inside `callback`; it runs on the reader thread.
     """
 
     def __init__(
@@ -45,24 +70,33 @@ class DPS150:
         timeout: float = 0.2,
         callback: Optional[UpdateCallback] = None,
         write_delay_s: float = 0.05,
+        changes_only: bool = True,
+        batch_init: bool = True,
     ) -> None:
         self.port_name = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.callback = callback or (lambda d: None)
         self.write_delay_s = write_delay_s
+        self.changes_only = changes_only
+        self.batch_init = batch_init
 
         self._ser: Optional[serial.Serial] = None
         self._reader_thread: Optional[threading.Thread] = None
         self._stop_evt = threading.Event()
-        self._rx_buf = bytearray()
-        self._lock = threading.Lock()
+        # RX ring: unread bytes live in _rx_buf[_rx_head:_rx_tail]
+        self._rx_buf = bytearray(RX_BUFFER_SIZE)
+        self._rx_head = 0
+        self._rx_tail = 0
+        self._next_write_ts = 0.0
+        self._recent_bad_frames = 0
+        self._last_state: Dict[str, object] = {}
 
     @property
     def is_open(self) -> bool:
         return self._ser is not None and self._ser.is_open
 
-    def open(self) -> None:
+    def open(self, start_reader: bool = True) -> None:
         if self.is_open:
             return
 
@@ -78,12 +112,16 @@ class DPS150:
             dsrdtr=False,
         )
 
+        self._rx_head = self._rx_tail = 0
+        self._recent_bad_frames = 0
+        self._last_state.clear()
         self._stop_evt.clear()
-        self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
-        self._reader_thread.start()
+        if start_reader:
+            self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+            self._reader_thread.start()
 
-        # init sequence like JS
-        self._init_commands()
+        # init sequence like JS; the info queries are pointless without a reader
+        self._init_commands(query_info=start_reader)
 
     def close(self) -> None:
         if not self.is_open:
@@ -91,16 +129,22 @@ class DPS150:
 
         # send session close (mirrors JS stop())
         try:
-            self._send(encode_session(False))
+            self._send(SESSION_CLOSE_FRAME)
         except Exception:
             pass
 
         self._stop_evt.set()
         if self._reader_thread:
             self._reader_thread.join(timeout=1.0)
+            self._reader_thread = None
 
         if self._ser:
             try:
+                # drain the session-close frame; a disconnected port may refuse
+                try:
+                    self._ser.flush()
+                except Exception:
+                    pass
                 self._ser.close()
             finally:
                 self._ser = None
@@ -108,50 +152,118 @@ class DPS150:
     def _send(self, data: bytes) -> None:
         if not self._ser:
             raise RuntimeError("Serial not open")
-        with self._lock:
-            self._ser.write(data)
-            self._ser.flush()
-        time.sleep(self.write_delay_s)
+        # Single writer (see class docstring), so no lock. Only wait if the
+        # previous write's pacing window is still open.
+        delay = self._next_write_ts - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._ser.write(data)
+        self._next_write_ts = time.monotonic() + self._write_delay()
+
+    def _write_delay(self) -> float:
+        if self._reader_thread is None:
+            # no reader, no error feedback: keep the fixed worst-case pacing
+            return self.write_delay_s
+        # 0 on a healthy line; scales up to write_delay_s as bad frames accumulate.
+        return self.write_delay_s * min(1.0, self._recent_bad_frames / BAD_FRAMES_FOR_FULL_DELAY)
+
+    def _on_bad_checksum(self) -> None:
+        self._recent_bad_frames = min(self._recent_bad_frames + 1, BAD_FRAMES_FOR_FULL_DELAY)
+
+    def _rx_make_room(self) -> None:
+        """
+        Reclaim consumed space at the front of the RX buffer.
+
+        Compaction only happens once the head passes the middle (or the tail hits
+        the end), so moving the unread tail is amortized O(1) per received byte.
+        """
+        head, tail = self._rx_head, self._rx_tail
+        cap = len(self._rx_buf)
+        if head == tail:
+            self._rx_head = self._rx_tail = 0
+        elif head > cap // 2 or tail == cap:
+            if head == 0:
+                # buffer full of bytes that never formed a frame: drop them
+                self._rx_head = self._rx_tail = 0
+                return
+            unread = tail - head
+            self._rx_buf[:unread] = self._rx_buf[head:tail]
+            self._rx_head = 0
+            self._rx_tail = unread
+
+    def _send_many(self, frames: List[bytes]) -> None:
+        # Concatenate back-to-back frames into one write: one syscall, one pacing window.
+        self._send(b"".join(frames))
 
     def _reader_loop(self) -> None:
         assert self._ser is not None
-        while not self._stop_evt.is_set():
-            try:
-                chunk = self._ser.read(1024)
-                if chunk:
-                    self._rx_buf.extend(chunk)
-
-                    while True:
-                        res = try_extract_frame(self._rx_buf)
-                        if res is None:
-                            break
-                        frame, consumed = res
-                        # consume
-                        del self._rx_buf[:consumed]
-
-                        updates = parse_payload(frame.type_id, frame.payload)
-                        if updates:
-                            self.callback(updates)
-            except Exception:
-                # Keep loop alive; caller can restart by reopening.
-                time.sleep(0.1)
-
-    def _init_commands(self) -> None:
+        # Read straight into the RX buffer's free tail (pyserial ports all have readinto).
+        with memoryview(self._rx_buf) as view:
+            while not self._stop_evt.is_set():
+                try:
+                    self._rx_make_room()
+                    free = min(1024, len(self._rx_buf) - self._rx_tail)
+                    n = self._ser.readinto(view[self._rx_tail:self._rx_tail + free]) or 0
+                    if n:
+                        self._rx_tail += n
+
+                        while True:
+                            # on a miss the head still moves past noise and rejected
+                            # candidates, so each bad frame is reported only once
+                            frame, self._rx_head = scan_frame(
+                                self._rx_buf, self._rx_head, self._rx_tail, self._on_bad_checksum
+                            )
+                            if frame is None:
+                                break
+                            if self._recent_bad_frames:
+                                # decay: each good frame relaxes pacing one step
+                                self._recent_bad_frames -= 1
+
+                            self._emit(parse_payload(frame.type_id, frame.payload))
+                except Exception:
+                    # Keep loop alive; caller can restart by reopening.
+                    time.sleep(0.1)
+
+    def _emit(self, updates: Dict[str, object]) -> None:
+        if self.changes_only:
+            last = self._last_state
+            diff = {k: v for k, v in updates.items() if k not in last or last[k] != v}
+            last.update(updates)
+            updates = diff
+        if updates:
+            self.callback(updates)
+
+    def _init_commands(self, query_info: bool = True) -> None:
         # JS:
         # sendCommand(HEADER_OUTPUT, CMD_SESSION, 0, 1)
         # sendCommand(HEADER_OUTPUT, CMD_BAUD, 0, idx(115200)+1)
-        self._send(encode_session(True))
+        # JS sends these one by one. Batching them into one write assumes the
+        # device accepts them concatenated (untested on hardware; see batch_init).
 
         # baud table: [9600, 19200, 38400, 57600, 115200]
         baud_table = [9600, 19200, 38400, 57600, 115200]
         idx = baud_table.index(self.baudrate) if self.baudrate in baud_table else (len(baud_table) - 1)
-        # frame: header, cmd, type_id=0, payload=[idx+1]
-        self._send(encode_frame(HEADER_OUTPUT, CMD_BAUD, 0, bytes([idx + 1])))
 
-        self.get(MODEL_NAME)
-        self.get(HARDWARE_VERSION)
-        self.get(FIRMWARE_VERSION)
-        self.get_all()
+        frames = [
+            SESSION_OPEN_FRAME,
+            # frame: header, cmd, type_id=0, payload=[idx+1]
+            encode_frame(HEADER_OUTPUT, CMD_BAUD, 0, bytes([idx + 1])),
+        ]
+        if query_info:
+            frames += [
+                encode_get(MODEL_NAME),
+                encode_get(HARDWARE_VERSION),
+                encode_get(FIRMWARE_VERSION),
+                GET_ALL_FRAME,
+            ]
+
+        if self.batch_init:
+            self._send_many(frames)
+            return
+        for frame in frames:
+            self._send(frame)
+            # keep the original fixed gap regardless of adaptive pacing
+            self._next_write_ts = time.monotonic() + self.write_delay_s
 
     # -------- Public commands --------
 
@@ -159,7 +271,7 @@ class DPS150:
         self._send(encode_get(type_id))
 
     def get_all(self) -> None:
-        self._send(encode_get(ALL))
+        self._send(GET_ALL_FRAME)
 
     def set_float(self, type_id: int, value: float) -> None:
         self._send(encode_set_float(type_id, value))
@@ -168,13 +280,13 @@ class DPS150:
         self._send(encode_set_byte(type_id, value))
 
     def enable_output(self) -> None:
-        self.set_byte(OUTPUT_ENABLE, 1)
+        self._send(ENABLE_OUTPUT_FRAME)
 
     def disable_output(self) -> None:
-        self.set_byte(OUTPUT_ENABLE, 0)
+        self._send(DISABLE_OUTPUT_FRAME)
 
     def start_metering(self) -> None:
-        self.set_byte(METERING_ENABLE, 1)
+        self._send(START_METERING_FRAME)
 
     def stop_metering(self) -> None:
-        self.set_byte(METERING_ENABLE, 0)
+        self._send(STOP_METERING_FRAME)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import functools
 import struct
 from dataclasses import dataclass
-from typing import Dict, Optional, Tuple, Union
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
 
 
 HEADER_INPUT = 0xF0   # device -> host frames often use 0xF0 in your JS parser
@@ -60,7 +61,7 @@ PROTECTION_STATES = [
 ]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Frame:
     header: int
     cmd: int
@@ -78,23 +79,38 @@ def checksum(type_id: int, payload: bytes) -> int:
     return s & 0xFF
 
 
-def encode_frame(header: int, cmd: int, type_id: int, payload: Union[bytes, bytearray]) -> bytes:
-    payload_b = bytes(payload)
-    c4 = len(payload_b)
-    c6 = checksum(type_id, payload_b)
-    return bytes([header, cmd, type_id, c4]) + payload_b + bytes([c6])
+_FRAME_HEAD = struct.Struct("<4B")  # header, cmd, type_id, c4
+
+
+def encode_frame(header: int, cmd: int, type_id: int, payload: Union[bytes, bytearray, Iterable[int]]) -> bytes:
+    if not isinstance(payload, (bytes, bytearray)):
+        payload = bytes(payload)
+    c4 = len(payload)
+    c6 = checksum(type_id, payload)
+    # one join instead of a chain of '+' concatenations
+    return b"".join((_FRAME_HEAD.pack(header, cmd, type_id, c4), payload, bytes((c6,))))
+
+
+# Encoded frames are immutable bytes and pure functions of their inputs, so
+# repeated commands (e.g. the same OVP/vset from a script) reuse frames. Setters
+# are cached on the packed payload rather than the value: 0.0 == -0.0 (and
+# 5 == 5.0) as dict keys, but only the packed bytes say what goes on the wire.
+@functools.lru_cache(maxsize=256)
+def _encode_set(type_id: int, payload: bytes, header: int) -> bytes:
+    return encode_frame(header, CMD_SET, type_id, payload)
 
 
 def encode_set_float(type_id: int, value: float, header: int = HEADER_OUTPUT) -> bytes:
     payload = struct.pack("<f", float(value))
-    return encode_frame(header, CMD_SET, type_id, payload)
+    return _encode_set(type_id, payload, header)
 
 
 def encode_set_byte(type_id: int, value: int, header: int = HEADER_OUTPUT) -> bytes:
     payload = bytes([int(value) & 0xFF])
-    return encode_frame(header, CMD_SET, type_id, payload)
+    return _encode_set(type_id, payload, header)
 
 
+@functools.lru_cache(maxsize=256)
 def encode_get(type_id: int, header: int = HEADER_OUTPUT) -> bytes:
     # JS uses payload [0] for GET requests
     return encode_frame(header, CMD_GET, type_id, bytes([0]))
@@ -105,138 +121,259 @@ def encode_session(open_session: bool, header: int = HEADER_OUTPUT) -> bytes:
     return encode_frame(header, CMD_SESSION, 0, bytes([1 if open_session else 0]))
 
 
-def try_extract_frame(buffer: bytearray) -> Optional[Tuple[Frame, int]]:
-    """
-    Attempt to find and validate a frame inside `buffer`.
-    Returns (frame, consumed_bytes) if found; otherwise None.
+# Frequently sent frames are constant; build them once at import.
+GET_ALL_FRAME = encode_get(ALL)
+SESSION_OPEN_FRAME = encode_session(True)
+SESSION_CLOSE_FRAME = encode_session(False)
+ENABLE_OUTPUT_FRAME = encode_set_byte(OUTPUT_ENABLE, 1)
+DISABLE_OUTPUT_FRAME = encode_set_byte(OUTPUT_ENABLE, 0)
+START_METERING_FRAME = encode_set_byte(METERING_ENABLE, 1)
+STOP_METERING_FRAME = encode_set_byte(METERING_ENABLE, 0)
 
-    We search for sequence [0xF0, 0xA1] like your JS reader (input header + CMD_GET),
-    but to be more robust we accept headers 0xF0 or 0xF1 and any cmd.
-    """
-    n = len(buffer)
-    if n < 6:
-        return None
 
-    for i in range(0, n - 5):
-        header = buffer[i]
-        if header not in (HEADER_INPUT, HEADER_OUTPUT):
-            continue
+def _find_frame(
+    buffer: bytearray,
+    start: int = 0,
+    end: Optional[int] = None,
+    on_bad_checksum: Optional[Callable[[], None]] = None,
+) -> Tuple[Optional[Tuple[int, int, int, bytes]], int]:
+    """
+    Pure-Python frame scan; returns ((header, cmd, type_id, payload) or None, next_index).
+    See scan_frame() for next_index. Replaced by the compiled version from
+    `_protocol` when that extension is built.
+    """
+    if start < 0:
+        raise ValueError(f"start must be >= 0, got {start}")
+    n = len(buffer) if end is None else min(end, len(buffer))
+    if n - start < 6:
+        return None, start
+
+    # Jump to the next candidate header with C-level scans instead of a per-byte loop.
+    # Each header's next position is kept across iterations and only re-searched
+    # once consumed, so a header byte absent from the buffer is scanned for once.
+    limit = n - 5
+    i_in = buffer.find(HEADER_INPUT, start, limit)
+    i_out = buffer.find(HEADER_OUTPUT, start, limit)
+    while i_in >= 0 or i_out >= 0:
+        if i_out < 0 or (0 <= i_in < i_out):
+            i = i_in
+            i_in = buffer.find(HEADER_INPUT, i + 1, limit)
+        else:
+            i = i_out
+            i_out = buffer.find(HEADER_OUTPUT, i + 1, limit)
 
-        cmd = buffer[i + 1]
         type_id = buffer[i + 2]
         c4 = buffer[i + 3]
 
-        end = i + 4 + c4  # end of payload
-        if end >= n:
+        payload_end = i + 4 + c4
+        if payload_end >= n:
             # not enough yet
-            return None
+            return None, i
 
-        payload = bytes(buffer[i + 4 : i + 4 + c4])
-        c6 = buffer[i + 4 + c4]
+        # Validate on the bytearray slice; only copy to immutable bytes once it matches.
+        payload = buffer[i + 4 : payload_end]
+        c6 = buffer[payload_end]
 
-        if checksum(type_id, payload) != c6:
+        # checksum() inlined: sum() over the slice runs in C; c4 is already the length
+        if (type_id + c4 + sum(payload)) & 0xFF != c6:
             # checksum mismatch: skip this byte and continue searching
+            if on_bad_checksum is not None:
+                on_bad_checksum()
             continue
 
-        frame = Frame(header=header, cmd=cmd, type_id=type_id, payload=payload)
-        consumed = i + 5 + c4
-        return frame, consumed
+        return (buffer[i], buffer[i + 1], type_id, bytes(payload)), payload_end + 1
+
+    # no header before limit; the last 5 bytes may still start one
+    return None, limit
+
+
+def scan_frame(
+    buffer: bytearray,
+    start: int = 0,
+    end: Optional[int] = None,
+    on_bad_checksum: Optional[Callable[[], None]] = None,
+) -> Tuple[Optional[Frame], int]:
+    """
+    Like try_extract_frame(), but always returns (frame or None, next_index).
+
+    On a miss, next_index is the first offset that may still begin a frame: all
+    bytes before it are noise or rejected candidates. Advancing past them means
+    they are neither rescanned nor reported to `on_bad_checksum` again.
+    """
+    found, next_index = _find_frame(buffer, start, end, on_bad_checksum)
+    if found is None:
+        return None, next_index
+    header, cmd, type_id, payload = found
+    return Frame(header=header, cmd=cmd, type_id=type_id, payload=payload), next_index
+
+
+def try_extract_frame(
+    buffer: bytearray,
+    start: int = 0,
+    end: Optional[int] = None,
+    on_bad_checksum: Optional[Callable[[], None]] = None,
+) -> Optional[Tuple[Frame, int]]:
+    """
+    Attempt to find and validate a frame inside `buffer[start:end]`.
+    Returns (frame, next_index) if found, where next_index is the absolute offset
+    just past the frame (i.e. the consumed byte count when start == 0); otherwise None.
+
+    We search for sequence [0xF0, 0xA1] like your JS reader (input header + CMD_GET),
+    but to be more robust we accept headers 0xF0 or 0xF1 and any cmd.
+
+    `on_bad_checksum`, if given, is called for every candidate frame whose
+    checksum does not match (a sign of line noise or lost bytes).
+    """
+    frame, next_index = scan_frame(buffer, start, end, on_bad_checksum)
+    if frame is None:
+        return None
+    return frame, next_index
+
+
+_F32 = struct.Struct("<f")
+
+
+def _f32(payload: bytes, offset: int) -> float:
+    return _F32.unpack_from(payload, offset)[0]
+
 
-    return None
+def _protection_state(idx: int) -> str:
+    return PROTECTION_STATES[idx] if idx < len(PROTECTION_STATES) else str(idx)
+
+
+def _float_parser(key: str) -> Callable[[bytes], Dict[str, object]]:
+    def parse(payload: bytes) -> Dict[str, object]:
+        return {key: _f32(payload, 0)}
+    return parse
+
+
+def _string_parser(key: str) -> Callable[[bytes], Dict[str, object]]:
+    def parse(payload: bytes) -> Dict[str, object]:
+        return {key: payload.decode(errors="replace")}
+    return parse
+
+
+def _parse_output(payload: bytes) -> Dict[str, object]:
+    # output voltage, current, power
+    return {
+        "outputVoltage": _f32(payload, 0),
+        "outputCurrent": _f32(payload, 4),
+        "outputPower": _f32(payload, 8),
+    }
+
+
+def _parse_output_closed(payload: bytes) -> Dict[str, object]:
+    return {"outputClosed": (payload[0] == 1)}
+
+
+def _parse_protection(payload: bytes) -> Dict[str, object]:
+    return {"protectionState": _protection_state(payload[0])}
+
+
+def _parse_mode(payload: bytes) -> Dict[str, object]:
+    # cc=0 or cv=1
+    return {"mode": "CC" if payload[0] == 0 else "CV"}
+
+
+# ALL block layout: 24 contiguous floats at 0..95, then capacity/energy at 99/103
+# and the upper limits at 111/115. Each group is unpacked with a single call.
+# unpack_from already does one contiguous C-level read straight into Python
+# floats, so NumPy (np.frombuffer(...).tolist()) would buy nothing but a dependency.
+_ALL_HEAD = struct.Struct("<24f")
+_ALL_HEAD_KEYS = (
+    "inputVoltage",
+    "setVoltage",
+    "setCurrent",
+    "outputVoltage",
+    "outputCurrent",
+    "outputPower",
+    "temperature",
+
+    "group1setVoltage",
+    "group1setCurrent",
+    "group2setVoltage",
+    "group2setCurrent",
+    "group3setVoltage",
+    "group3setCurrent",
+    "group4setVoltage",
+    "group4setCurrent",
+    "group5setVoltage",
+    "group5setCurrent",
+    "group6setVoltage",
+    "group6setCurrent",
+
+    "overVoltageProtection",
+    "overCurrentProtection",
+    "overPowerProtection",
+    "overTemperatureProtection",
+    "lowVoltageProtection",
+)
+_ALL_TAIL = struct.Struct("<2f")    # outputCapacity (Ah), outputEnergy (Wh) at 99
+_ALL_LIMITS = struct.Struct("<2f")  # upperLimitVoltage, upperLimitCurrent at 111
+
+
+def _parse_all(payload: bytes) -> Dict[str, object]:
+    """
+    "ALL" block: follow your JS offsets exactly.
+    """
+    # NOTE: This assumes payload is at least 96+ etc. If shorter, we guard.
+    if len(payload) < _ALL_HEAD.size:
+        return {"rawAll": payload}
+
+    out: Dict[str, object] = dict(zip(_ALL_HEAD_KEYS, _ALL_HEAD.unpack_from(payload, 0)))
+
+    # bytes at fixed positions
+    if len(payload) > 98:
+        out["brightness"] = payload[96]
+        out["volume"] = payload[97]
+        out["meteringClosed"] = (payload[98] == 0)
+
+    if len(payload) >= 110:
+        out["outputCapacity"], out["outputEnergy"] = _ALL_TAIL.unpack_from(payload, 99)
+        out["outputClosed"] = (payload[107] == 1)
+        out["protectionState"] = _protection_state(payload[108])
+        out["mode"] = "CC" if payload[109] == 0 else "CV"
+
+    if len(payload) >= 119:
+        out["upperLimitVoltage"], out["upperLimitCurrent"] = _ALL_LIMITS.unpack_from(payload, 111)
+
+    return out
+
+
+# type_id -> handler; looked up once per frame instead of walking an if/elif chain
+_PARSERS: Dict[int, Callable[[bytes], Dict[str, object]]] = {
+    192: _float_parser("inputVoltage"),
+    195: _parse_output,
+    196: _float_parser("temperature"),
+    217: _float_parser("outputCapacity"),
+    218: _float_parser("outputEnergy"),
+    219: _parse_output_closed,
+    220: _parse_protection,
+    221: _parse_mode,
+    MODEL_NAME: _string_parser("modelName"),
+    HARDWARE_VERSION: _string_parser("hardwareVersion"),
+    FIRMWARE_VERSION: _string_parser("firmwareVersion"),
+    226: _float_parser("upperLimitVoltage"),
+    227: _float_parser("upperLimitCurrent"),
+    ALL: _parse_all,
+}
 
 
 def parse_payload(type_id: int, payload: bytes) -> Dict[str, object]:
     """
     Mirrors your JS parseData() mapping and returns a dict with zero or more keys.
     """
-    out: Dict[str, object] = {}
-
-    def f32(offset: int) -> float:
-        return struct.unpack_from("<f", payload, offset)[0]
-
-    # Single-values and small frames
-    if type_id == 192:  # input voltage
-        out["inputVoltage"] = f32(0)
-    elif type_id == 195:  # output voltage, current, power
-        out["outputVoltage"] = f32(0)
-        out["outputCurrent"] = f32(4)
-        out["outputPower"] = f32(8)
-    elif type_id == 196:  # temperature
-        out["temperature"] = f32(0)
-    elif type_id == 217:  # output capacity
-        out["outputCapacity"] = f32(0)
-    elif type_id == 218:  # output energy
-        out["outputEnergy"] = f32(0)
-    elif type_id == 219:  # output closed?
-        out["outputClosed"] = (payload[0] == 1)
-    elif type_id == 220:  # protection
-        idx = payload[0]
-        out["protectionState"] = PROTECTION_STATES[idx] if idx < len(PROTECTION_STATES) else str(idx)
-    elif type_id == 221:  # cc=0 or cv=1
-        out["mode"] = "CC" if payload[0] == 0 else "CV"
-    elif type_id == 222:
-        out["modelName"] = payload.decode(errors="replace")
-    elif type_id == 223:
-        out["hardwareVersion"] = payload.decode(errors="replace")
-    elif type_id == 224:
-        out["firmwareVersion"] = payload.decode(errors="replace")
-    elif type_id == 226:
-        out["upperLimitVoltage"] = f32(0)
-    elif type_id == 227:
-        out["upperLimitCurrent"] = f32(0)
-    elif type_id == 255:
-        # "ALL" block: follow your JS offsets exactly
-        # NOTE: This assumes payload is at least 96+ etc. If shorter, we guard.
-        if len(payload) < 95:
-            out["rawAll"] = payload
-            return out
-
-        out.update(
-            inputVoltage=f32(0),
-            setVoltage=f32(4),
-            setCurrent=f32(8),
-            outputVoltage=f32(12),
-            outputCurrent=f32(16),
-            outputPower=f32(20),
-            temperature=f32(24),
-
-            group1setVoltage=f32(28),
-            group1setCurrent=f32(32),
-            group2setVoltage=f32(36),
-            group2setCurrent=f32(40),
-            group3setVoltage=f32(44),
-            group3setCurrent=f32(48),
-            group4setVoltage=f32(52),
-            group4setCurrent=f32(56),
-            group5setVoltage=f32(60),
-            group5setCurrent=f32(64),
-            group6setVoltage=f32(68),
-            group6setCurrent=f32(72),
-
-            overVoltageProtection=f32(76),
-            overCurrentProtection=f32(80),
-            overPowerProtection=f32(84),
-            overTemperatureProtection=f32(88),
-            lowVoltageProtection=f32(92),
-        )
-
-        # bytes at fixed positions
-        if len(payload) > 98:
-            out["brightness"] = payload[96]
-            out["volume"] = payload[97]
-            out["meteringClosed"] = (payload[98] == 0)
-
-        if len(payload) >= 109:
-            out["outputCapacity"] = f32(99)   # Ah
-            out["outputEnergy"] = f32(103)    # Wh
-            out["outputClosed"] = (payload[107] == 1)
-            prot = payload[108]
-            out["protectionState"] = PROTECTION_STATES[prot] if prot < len(PROTECTION_STATES) else str(prot)
-            out["mode"] = "CC" if payload[109] == 0 else "CV"
-
-        if len(payload) >= 119:
-            out["upperLimitVoltage"] = f32(111)
-            out["upperLimitCurrent"] = f32(115)
-
+    handler = _PARSERS.get(type_id)
     # Unhandled type_ids are ignored
-    return out
+    return handler(payload) if handler else {}
+
+
+# Pure-Python versions stay reachable (e.g. for testing against the extension).
+_py_checksum = checksum
+_py_find_frame = _find_frame
+
+# Prefer the compiled hot paths when the optional Cython extension is built.
+try:
+    from ._protocol import _find_frame, checksum  # type: ignore[no-redef]
+except ImportError:
+    pass
@@ -22,6 +22,12 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--timeout", type=float, default=0.2, help="Serial read timeout in seconds")
     p.add_argument("--json", action="store_true", help="Print updates as JSON lines (default)")
     p.add_argument("--pretty", action="store_true", help="Pretty-print updates")
+    p.add_argument("--full", action="store_true", help="Print every parsed field, not only changed ones")
+    p.add_argument(
+        "--no-batch-init",
+        action="store_true",
+        help="Send the init sequence one frame at a time instead of as a single write",
+    )
 
     sub = p.add_subparsers(dest="cmd", required=True)
 
@@ -56,10 +62,22 @@ def main(argv: Optional[list[str]] = None) -> int:
         else:
             _print_update(d)
 
-    dev = DPS150(port=args.port, baudrate=args.baud, timeout=args.timeout, callback=cb)
+    dev = DPS150(
+        port=args.port,
+        baudrate=args.baud,
+        timeout=args.timeout,
+        callback=cb,
+        changes_only=not args.full,
+        batch_init=not args.no_batch_init,
+    )
+
+    # Fire-and-forget commands don't print responses, so skip the reader thread.
+    # Without a reader there is no error feedback, so writes keep the full
+    # write_delay_s between the init batch, the command and the closing session frame.
+    needs_reader = args.cmd in ("info", "get-all", "monitor")
 
     try:
-        dev.open()
+        dev.open(start_reader=needs_reader)
 
         if args.cmd == "info":
             # open() already queries model/hw/fw and calls get_all()
@@ -73,12 +91,10 @@ def main(argv: Optional[list[str]] = None) -> int:
 
         if args.cmd == "enable":
             dev.enable_output()
-            time.sleep(0.2)
             return 0
 
         if args.cmd == "disable":
             dev.disable_output()
-            time.sleep(0.2)
             return 0
 
         if args.cmd == "metering":
@@ -86,7 +102,6 @@ def main(argv: Optional[list[str]] = None) -> int:
                 dev.start_metering()
             else:
                 dev.stop_metering()
-            time.sleep(0.2)
             return 0
 
         if args.cmd == "set":
@@ -113,22 +128,25 @@ def main(argv: Optional[list[str]] = None) -> int:
             else:
                 raise SystemExit(f"Unknown 'set' target: {args.what}")
 
-            time.sleep(0.3)
             return 0
 
         if args.cmd == "monitor":
-            t0 = time.time()
-            last_poll = 0.0
+            # Updates are printed from the reader thread; this loop only has to wake
+            # for the next ALL poll or the end of --duration, so sleep until then.
+            t0 = time.monotonic()
+            deadline = t0 + args.duration if args.duration > 0 else None
+            next_poll = t0
             while True:
-                now = time.time()
-                if args.duration > 0 and (now - t0) >= args.duration:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
                     return 0
 
-                if args.get_all_interval > 0 and (now - last_poll) >= args.get_all_interval:
+                if args.get_all_interval > 0 and now >= next_poll:
                     dev.get_all()
-                    last_poll = now
+                    next_poll = now + args.get_all_interval
 
-                time.sleep(0.05)
+                wake_at = [t for t in (deadline, next_poll if args.get_all_interval > 0 else None) if t is not None]
+                time.sleep(max(0.0, min(wake_at) - time.monotonic()) if wake_at else 60.0)
 
         return 0
 
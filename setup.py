@@ -0,0 +1,14 @@
+from setuptools import Extension, setup
+
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    # optional=True: if compilation fails, install still succeeds with the pure-Python protocol
+    ext_modules = cythonize(
+        [Extension("dps150._protocol", ["dps150/_protocol.pyx"], optional=True)],
+        language_level=3,
+    )
+
+setup(ext_modules=ext_modules)
@@ -0,0 +1,323 @@
+import random
+import struct
+import threading
+import time
+
+import pytest
+
+from dps150 import device
+from dps150.device import DPS150, RX_BUFFER_SIZE
+from dps150.protocol import (
+    ALL,
+    CMD_BAUD,
+    CMD_GET,
+    HEADER_INPUT,
+    HEADER_OUTPUT,
+    GET_ALL_FRAME,
+    SESSION_CLOSE_FRAME,
+    SESSION_OPEN_FRAME,
+    encode_frame,
+)
+
+
+class FakeSerial:
+    """Stand-in for serial.Serial: serves queued chunks to readinto, records writes."""
+
+    def __init__(self, chunks=()):
+        self.chunks = [bytes(c) for c in chunks]
+        self.written = []
+        self.is_open = True
+        self.drained = threading.Event()
+
+    def readinto(self, b):
+        if not self.chunks:
+            self.drained.set()
+            time.sleep(0.001)
+            return 0
+        chunk = self.chunks.pop(0)
+        n = min(len(b), len(chunk))
+        b[:n] = chunk[:n]
+        if n < len(chunk):
+            self.chunks.insert(0, chunk[n:])
+        return n
+
+    def write(self, data):
+        self.written.append((time.monotonic(), bytes(data)))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.is_open = False
+
+
+def run_reader(dev, chunks):
+    """Feed `chunks` through dev._reader_loop and stop once they are consumed."""
+    dev._ser = FakeSerial(chunks)
+    dev._stop_evt.clear()
+    t = threading.Thread(target=dev._reader_loop, daemon=True)
+    t.start()
+    assert dev._ser.drained.wait(timeout=10.0)
+    dev._stop_evt.set()
+    t.join(timeout=1.0)
+    return dev._ser
+
+
+def voltage_frame(value):
+    return encode_frame(HEADER_INPUT, CMD_GET, 192, struct.pack("<f", value))
+
+
+def all_frame(set_voltage):
+    payload = bytearray(119)
+    payload[4:8] = struct.pack("<f", set_voltage)
+    return encode_frame(HEADER_INPUT, CMD_GET, ALL, bytes(payload))
+
+
+@pytest.fixture
+def fake_port(monkeypatch):
+    """Make DPS150.open() use a FakeSerial; returns the list of created ports."""
+    ports = []
+
+    def make(*args, **kwargs):
+        ports.append(FakeSerial())
+        return ports[-1]
+
+    monkeypatch.setattr(device.serial, "Serial", make)
+    return ports
+
+
+def split_randomly(data, rng, max_chunk=300):
+    chunks = []
+    pos = 0
+    while pos < len(data):
+        k = rng.randint(1, max_chunk)
+        chunks.append(data[pos:pos + k])
+        pos += k
+    return chunks
+
+
+@pytest.mark.parametrize("rx_size", [RX_BUFFER_SIZE, 64])
+def test_reader_delivers_all_frames_in_order_through_noise(rx_size):
+    rng = random.Random(1234)
+    stream = bytearray()
+    for i in range(3000):
+        # noise never contains header bytes, so it can't fake a frame start
+        stream += bytes(rng.randrange(0, HEADER_INPUT) for _ in range(rng.randint(0, 4)))
+        stream += voltage_frame(float(i))
+
+    seen = []
+    dev = DPS150("fake", callback=seen.append, changes_only=False)
+    # a tiny buffer forces compaction on almost every read
+    dev._rx_buf = bytearray(rx_size)
+    run_reader(dev, split_randomly(bytes(stream), rng))
+
+    assert [u["inputVoltage"] for u in seen] == [float(i) for i in range(3000)]
+    assert dev._rx_head <= dev._rx_tail <= rx_size
+
+
+def test_reader_drops_buffer_full_of_unframed_bytes_and_recovers():
+    seen = []
+    dev = DPS150("fake", callback=seen.append, changes_only=False)
+    dev._rx_buf = bytearray(64)
+    run_reader(dev, [b"\x00" * 64, voltage_frame(1.0) + voltage_frame(2.0)])
+
+    assert [u["inputVoltage"] for u in seen] == [1.0, 2.0]
+
+
+def test_rx_make_room_compacts_unread_tail_to_front():
+    dev = DPS150("fake")
+    dev._rx_buf = bytearray(16)
+    dev._rx_buf[9:12] = b"abc"
+    dev._rx_head, dev._rx_tail = 9, 12
+
+    dev._rx_make_room()
+
+    assert (dev._rx_head, dev._rx_tail) == (0, 3)
+    assert dev._rx_buf[:3] == b"abc"
+
+
+def test_rx_make_room_leaves_small_head_alone():
+    dev = DPS150("fake")
+    dev._rx_buf = bytearray(16)
+    dev._rx_head, dev._rx_tail = 3, 10
+
+    dev._rx_make_room()
+
+    assert (dev._rx_head, dev._rx_tail) == (3, 10)
+
+
+def test_rx_make_room_resets_when_everything_was_consumed():
+    dev = DPS150("fake")
+    dev._rx_buf = bytearray(16)
+    dev._rx_head = dev._rx_tail = 5
+
+    dev._rx_make_room()
+
+    assert (dev._rx_head, dev._rx_tail) == (0, 0)
+
+
+def test_rx_make_room_drops_full_buffer_with_no_consumed_bytes():
+    dev = DPS150("fake")
+    dev._rx_buf = bytearray(16)
+    dev._rx_head, dev._rx_tail = 0, 16
+
+    dev._rx_make_room()
+
+    assert (dev._rx_head, dev._rx_tail) == (0, 0)
+
+
+def test_unchanged_all_frame_produces_no_callback():
+    seen = []
+    dev = DPS150("fake", callback=seen.append)
+    run_reader(dev, [all_frame(5.0), all_frame(5.0)])
+
+    assert len(seen) == 1
+    assert seen[0]["setVoltage"] == 5.0
+
+
+def test_only_changed_keys_are_delivered():
+    seen = []
+    dev = DPS150("fake", callback=seen.append)
+    run_reader(dev, [all_frame(5.0), all_frame(12.0)])
+
+    assert len(seen) == 2
+    assert seen[1] == {"setVoltage": 12.0}
+
+
+def test_changes_only_false_passes_every_field():
+    seen = []
+    dev = DPS150("fake", callback=seen.append, changes_only=False)
+    run_reader(dev, [all_frame(5.0), all_frame(5.0)])
+
+    assert len(seen) == 2
+    assert seen[0] == seen[1]
+    assert "inputVoltage" in seen[1]
+
+
+def test_open_resets_last_reported_state(fake_port):
+    seen = []
+    dev = DPS150("fake", callback=seen.append)
+    dev._emit({"setVoltage": 5.0})
+
+    dev.open(start_reader=False)
+    try:
+        dev._emit({"setVoltage": 5.0})
+    finally:
+        dev.close()
+
+    assert seen == [{"setVoltage": 5.0}, {"setVoltage": 5.0}]
+
+
+def test_open_without_reader_sends_only_session_and_baud(fake_port):
+    dev = DPS150("fake", write_delay_s=0.0)
+    dev.open(start_reader=False)
+    try:
+        assert dev._reader_thread is None
+        baud = encode_frame(HEADER_OUTPUT, CMD_BAUD, 0, bytes([5]))  # 115200 -> index 4 + 1
+        assert [data for _, data in fake_port[0].written] == [SESSION_OPEN_FRAME + baud]
+    finally:
+        dev.close()
+
+    assert fake_port[0].written[-1][1] == SESSION_CLOSE_FRAME
+    assert not dev.is_open
+
+
+def test_reopen_with_reader_after_readerless_session(fake_port):
+    dev = DPS150("fake", write_delay_s=0.0)
+    dev.open(start_reader=False)
+    dev.close()
+
+    dev.open()
+    try:
+        assert dev._reader_thread is not None and dev._reader_thread.is_alive()
+        init = fake_port[1].written[0][1]
+        assert init.startswith(SESSION_OPEN_FRAME)
+        assert init.endswith(GET_ALL_FRAME)
+    finally:
+        dev.close()
+
+    assert dev._reader_thread is None
+
+
+def test_bad_frame_is_counted_once_across_partial_reads():
+    good = voltage_frame(1.0)
+    bad = bytearray(voltage_frame(2.0))
+    bad[-1] ^= 0xFF
+
+    bad_seen = []
+    seen = []
+    dev = DPS150("fake", callback=seen.append)
+    dev._on_bad_checksum = lambda: (bad_seen.append(1), DPS150._on_bad_checksum(dev))
+    # the good frame arrives over three more reads after the corrupted one
+    run_reader(dev, [bytes(bad), good[:3], good[3:6], good[6:]])
+
+    assert len(bad_seen) == 1
+    assert seen == [{"inputVoltage": 1.0}]
+    assert dev._recent_bad_frames == 0
+
+
+def test_write_delay_without_reader_is_fixed():
+    dev = DPS150("fake", write_delay_s=0.05)
+    assert dev._reader_thread is None
+    assert dev._write_delay() == 0.05
+
+    dev._ser = FakeSerial()
+    dev._send(b"a")
+    dev._send(b"b")
+    (t0, _), (t1, _) = dev._ser.written
+    assert t1 - t0 >= 0.05
+
+
+def test_write_delay_scales_with_bad_frames_and_decays():
+    dev = DPS150("fake", write_delay_s=0.06)
+    dev._reader_thread = threading.Thread(target=lambda: None)  # stands in for a running reader
+    assert dev._write_delay() == 0.0
+
+    dev._on_bad_checksum()
+    assert dev._write_delay() == pytest.approx(0.02)
+
+    for _ in range(5):
+        dev._on_bad_checksum()
+    # capped, so the line recovers after a bounded number of good frames
+    assert dev._recent_bad_frames == device.BAD_FRAMES_FOR_FULL_DELAY
+    assert dev._write_delay() == pytest.approx(0.06)
+
+    good = [voltage_frame(float(i)) for i in range(2)]
+    run_reader(dev, good)
+    assert dev._recent_bad_frames == 1
+    assert dev._write_delay() == pytest.approx(0.02)
+
+    run_reader(dev, [voltage_frame(9.0)])
+    assert dev._write_delay() == 0.0
+
+
+def test_close_survives_disconnected_port(fake_port):
+    dev = DPS150("fake", write_delay_s=0.0)
+    dev.open(start_reader=False)
+    port = fake_port[0]
+
+    def fail(*args):
+        raise OSError("device disconnected")
+
+    port.write = fail
+    port.flush = fail
+
+    dev.close()
+
+    assert not port.is_open
+    assert dev._ser is None
+
+
+def test_unbatched_init_sends_frames_separately_with_fixed_gap(fake_port):
+    dev = DPS150("fake", write_delay_s=0.02, batch_init=False)
+    dev.open()
+    try:
+        init = fake_port[0].written
+        assert [data for _, data in init][0] == SESSION_OPEN_FRAME
+        assert [data for _, data in init][-1] == GET_ALL_FRAME
+        assert len(init) == 6
+        gaps = [b[0] - a[0] for a, b in zip(init, init[1:])]
+        assert min(gaps) >= 0.02
+    finally:
+        dev.close()
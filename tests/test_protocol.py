@@ -1,6 +1,10 @@
+import random
 import struct
+import types
+
 import pytest
 
+from dps150 import protocol
 from dps150.protocol import (
     Frame,
     checksum,
@@ -10,6 +14,7 @@ from dps150.protocol import (
     encode_set_byte,
     encode_set_float,
     try_extract_frame,
+    scan_frame,
     parse_payload,
     HEADER_OUTPUT,
     HEADER_INPUT,
@@ -17,15 +22,36 @@ from dps150.protocol import (
     CMD_SET,
     CMD_SESSION,
     ALL,
+    METERING_ENABLE,
+    OUTPUT_ENABLE,
+    GET_ALL_FRAME,
+    SESSION_OPEN_FRAME,
+    SESSION_CLOSE_FRAME,
+    ENABLE_OUTPUT_FRAME,
+    DISABLE_OUTPUT_FRAME,
+    START_METERING_FRAME,
+    STOP_METERING_FRAME,
 )
 
 
-def test_checksum_matches_js_definition():
+@pytest.fixture(params=["python", "compiled"])
+def impl(request, monkeypatch):
+    """Run a test against the pure-Python and (if built) the Cython hot paths."""
+    if request.param == "python":
+        mod = types.SimpleNamespace(checksum=protocol._py_checksum, _find_frame=protocol._py_find_frame)
+    else:
+        mod = pytest.importorskip("dps150._protocol")
+    monkeypatch.setattr(protocol, "checksum", mod.checksum)
+    monkeypatch.setattr(protocol, "_find_frame", mod._find_frame)
+    return mod
+
+
+def test_checksum_matches_js_definition(impl):
     # JS: s = type_id + len + sum(payload); s %= 0x100
     type_id = 0xC1
     payload = bytes([1, 2, 3, 255])
     expected = (type_id + len(payload) + sum(payload)) & 0xFF
-    assert checksum(type_id, payload) == expected
+    assert impl.checksum(type_id, payload) == expected
 
 
 def test_encode_frame_layout_and_checksum():
@@ -77,6 +103,7 @@ def test_encode_set_byte_is_single_byte():
     assert f[4] == 7
 
 
+@pytest.mark.usefixtures("impl")
 def test_try_extract_frame_finds_frame_with_noise_prefix():
     payload = bytes([0x10, 0x20])
     frame_bytes = encode_frame(HEADER_INPUT, 0xA1, 0x55, payload)
@@ -97,6 +124,7 @@ def test_try_extract_frame_finds_frame_with_noise_prefix():
     assert buf.startswith(b"\x99\x88")
 
 
+@pytest.mark.usefixtures("impl")
 def test_try_extract_frame_rejects_bad_checksum_and_continues():
     payload = bytes([0x10, 0x20])
     good = encode_frame(HEADER_INPUT, 0xA1, 0x55, payload)
@@ -184,3 +212,200 @@ def test_parse_payload_all_happy_path_extracts_key_fields():
     assert out["mode"] == "CC"
     assert out["upperLimitVoltage"] == pytest.approx(20.0)
     assert out["upperLimitCurrent"] == pytest.approx(5.0)
+
+
+@pytest.mark.usefixtures("impl")
+def test_try_extract_frame_skips_false_headers_in_noise():
+    payload = bytes([0x01, 0x02, 0x03])
+    frame_bytes = encode_frame(HEADER_OUTPUT, 0xB1, 0x42, payload)
+
+    # 0xF0/0xF1 bytes inside the noise must not be mistaken for a frame start
+    noise = bytes([0xF0, 0x00, 0x00, 0x00, 0x55, 0xF1, 0x01, 0x02, 0x00, 0x77])
+    res = try_extract_frame(bytearray(noise + frame_bytes))
+    assert res is not None
+    frame, consumed = res
+    assert frame.header == HEADER_OUTPUT
+    assert frame.type_id == 0x42
+    assert frame.payload == payload
+    assert consumed == len(noise) + len(frame_bytes)
+
+
+@pytest.mark.usefixtures("impl")
+def test_try_extract_frame_waits_for_incomplete_frame():
+    frame_bytes = encode_frame(HEADER_INPUT, 0xA1, 0xDE, b"DPS150")
+    assert try_extract_frame(bytearray(b"\x00\x00" + frame_bytes[:-2])) is None
+
+
+def test_parse_payload_byte_states_and_unknown_type():
+    assert parse_payload(219, b"\x01") == {"outputClosed": True}
+    assert parse_payload(220, b"\x02") == {"protectionState": "OCP"}
+    assert parse_payload(220, b"\x09") == {"protectionState": "9"}
+    assert parse_payload(221, b"\x01") == {"mode": "CV"}
+    assert parse_payload(0x01, b"\x00") == {}
+
+
+def test_parse_payload_all_head_only():
+    values = [float(i) for i in range(24)]
+    out = parse_payload(ALL, struct.pack("<24f", *values))
+    assert out["inputVoltage"] == 0.0
+    assert out["group6setCurrent"] == pytest.approx(18.0)
+    assert out["lowVoltageProtection"] == pytest.approx(23.0)
+    assert "brightness" not in out
+    assert "outputCapacity" not in out
+
+
+def test_prebuilt_frames_match_encoders():
+    assert GET_ALL_FRAME == encode_get(ALL)
+    assert SESSION_OPEN_FRAME == encode_session(True)
+    assert SESSION_CLOSE_FRAME == encode_session(False)
+    assert ENABLE_OUTPUT_FRAME == encode_set_byte(OUTPUT_ENABLE, 1)
+    assert DISABLE_OUTPUT_FRAME == encode_set_byte(OUTPUT_ENABLE, 0)
+    assert START_METERING_FRAME == encode_set_byte(METERING_ENABLE, 1)
+    assert STOP_METERING_FRAME == encode_set_byte(METERING_ENABLE, 0)
+
+
+@pytest.mark.usefixtures("impl")
+def test_try_extract_frame_respects_start_and_end_window():
+    first = encode_frame(HEADER_INPUT, 0xA1, 0x55, bytes([0x10]))
+    second = encode_frame(HEADER_INPUT, 0xA1, 0x56, bytes([0x20, 0x30]))
+    buf = bytearray(first + second + b"\x00" * 16)
+    end = len(first) + len(second)
+
+    frame, head = try_extract_frame(buf, 0, end)
+    assert frame.type_id == 0x55
+    assert head == len(first)
+
+    frame, head = try_extract_frame(buf, head, end)
+    assert frame.type_id == 0x56
+    assert head == end
+
+    assert try_extract_frame(buf, head, end) is None
+    # a window that cuts the second frame short must wait for more data
+    assert try_extract_frame(buf, len(first), end - 1) is None
+
+
+def test_frame_has_no_instance_dict():
+    frame = Frame(header=HEADER_INPUT, cmd=CMD_GET, type_id=ALL, payload=b"\x01\x02")
+    assert not hasattr(frame, "__dict__")
+    assert frame.length == 2
+
+
+def test_encoders_reuse_frames_for_repeated_args():
+    assert encode_get(0x22) is encode_get(0x22)
+    assert encode_set_float(193, 5.0) is encode_set_float(193, 5.0)
+    assert encode_set_byte(214, 7) is encode_set_byte(214, 7)
+    assert encode_set_byte(214, 7) != encode_set_byte(214, 8)
+
+
+def test_encode_frame_accepts_bytearray_payload():
+    payload = bytearray([0x01, 0x02])
+    assert encode_frame(HEADER_OUTPUT, CMD_SET, 0xD6, payload) == encode_frame(
+        HEADER_OUTPUT, CMD_SET, 0xD6, bytes(payload)
+    )
+
+
+@pytest.mark.usefixtures("impl")
+def test_try_extract_frame_reports_bad_checksums():
+    good = encode_frame(HEADER_INPUT, 0xA1, 0x55, bytes([0x10, 0x20]))
+    bad = bytearray(good)
+    bad[-1] ^= 0xFF
+
+    bad_seen = []
+    res = try_extract_frame(bytearray(bad + good), on_bad_checksum=lambda: bad_seen.append(1))
+    assert res is not None
+    assert len(bad_seen) == 1
+
+
+@pytest.mark.usefixtures("impl")
+def test_try_extract_frame_many_candidates_of_one_header_type():
+    # lots of 0xF0 false headers, and the only 0xF1 is the real frame at the end
+    noise = bytes([HEADER_INPUT, 0x00, 0x00, 0x00, 0x55]) * 200
+    frame_bytes = encode_frame(HEADER_OUTPUT, CMD_SET, 0x42, bytes([0x01]))
+    res = try_extract_frame(bytearray(noise + frame_bytes))
+    assert res is not None
+    frame, consumed = res
+    assert frame.header == HEADER_OUTPUT
+    assert consumed == len(noise) + len(frame_bytes)
+
+
+def test_compiled_scan_and_checksum_match_pure_python():
+    compiled = pytest.importorskip("dps150._protocol")
+    rng = random.Random(150)
+    for _ in range(5000):
+        buf = bytearray(rng.choice([0x00, 0x01, 0x05, HEADER_INPUT, HEADER_OUTPUT]) for _ in range(rng.randint(0, 40)))
+        if rng.random() < 0.5:
+            payload = bytes(rng.randrange(256) for _ in range(rng.randint(0, 6)))
+            frame_bytes = encode_frame(rng.choice([HEADER_INPUT, HEADER_OUTPUT]), CMD_GET, rng.randrange(256), payload)
+            k = rng.randint(0, len(buf))
+            buf[k:k] = frame_bytes
+        start = rng.randint(0, len(buf))
+        end = rng.choice([None, rng.randint(start, len(buf))])
+
+        if rng.random() < 0.05:
+            negative = -rng.randint(1, 100000)
+            with pytest.raises(ValueError):
+                protocol._py_find_frame(buf, negative, end)
+            with pytest.raises(ValueError):
+                compiled._find_frame(buf, negative, end)
+
+        py_bad, c_bad = [], []
+        expected = protocol._py_find_frame(buf, start, end, lambda: py_bad.append(1))
+        assert compiled._find_frame(buf, start, end, lambda: c_bad.append(1)) == expected
+        assert c_bad == py_bad
+        assert compiled.checksum(0x55, bytes(buf)) == protocol._py_checksum(0x55, bytes(buf))
+
+
+def test_encode_set_float_keeps_negative_zero_distinct():
+    pos = encode_set_float(193, 0.0)
+    neg = encode_set_float(193, -0.0)
+    assert pos[4:8] == struct.pack("<f", 0.0)
+    assert neg[4:8] == struct.pack("<f", -0.0)
+    assert encode_set_float(193, 0.0) == pos
+
+
+@pytest.mark.usefixtures("impl")
+def test_encode_frame_and_checksum_accept_int_lists():
+    assert protocol.checksum(0x01, [1, 2]) == protocol.checksum(0x01, bytes([1, 2]))
+    assert encode_frame(HEADER_OUTPUT, CMD_SET, 0x01, [1, 2]) == encode_frame(
+        HEADER_OUTPUT, CMD_SET, 0x01, bytes([1, 2])
+    )
+
+
+@pytest.mark.usefixtures("impl")
+def test_scan_frame_miss_reports_where_to_resume():
+    good = encode_frame(HEADER_INPUT, 0xA1, 0x55, bytes([0x10, 0x20]))
+    bad = bytearray(good)
+    bad[-1] ^= 0xFF
+    noise = b"\x00\x01\x02"
+
+    # rejected candidate + incomplete frame: resume at the incomplete frame's header
+    buf = bytearray(noise + bad + good[:-1])
+    frame, resume = scan_frame(buf)
+    assert frame is None
+    assert resume == len(noise) + len(bad)
+
+    # no header at all: everything but the last 5 bytes can be skipped
+    frame, next_index = scan_frame(bytearray(b"\x00" * 20))
+    assert frame is None
+    assert next_index == 15
+
+    # too short to hold a frame: nothing is skipped
+    assert scan_frame(bytearray(b"\x00" * 3), 1) == (None, 1)
+
+    frame, next_index = scan_frame(buf + good[-1:], resume)
+    assert frame.payload == bytes([0x10, 0x20])
+    assert next_index == len(buf) + 1
+
+
+@pytest.mark.usefixtures("impl")
+def test_scan_frame_clamps_end_to_buffer_length():
+    assert scan_frame(bytearray(3), 0, 100) == (None, 0)
+    assert scan_frame(bytearray(20), 0, 100) == (None, 15)
+
+
+@pytest.mark.usefixtures("impl")
+def test_scan_frame_rejects_negative_start():
+    with pytest.raises(ValueError):
+        scan_frame(bytearray(26), -3)
+    with pytest.raises(ValueError):
+        try_extract_frame(bytearray(26), -100000)